@@ -1,25 +1,154 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 import pandas as pd
 import numpy as np
-from tensorflow.keras.models import load_model
 import joblib
+from sklearn.preprocessing import StandardScaler
 import os
-from extract_features import extract_url_features
+import json
+import csv
+import threading
+import asyncio
+import atexit
+import time
+from collections import deque
+from extract_features import cached_url_features, process_urls_sync_only, extraction_pool, FEATURE_ORDER
+from micro_batcher import MicroBatcher
 
 app = Flask(__name__)
 
-# Load the pre-trained model and scaler (ensure these files are in your working directory)
-model = load_model('221IT019_CNN_model.h5')
+# Load the pre-trained scaler (ensure the model and scaler files are in your working directory)
+MODEL_PATH = '221IT019_CNN_model.h5'
+ONNX_MODEL_PATH = '221IT019_CNN_model.onnx'  # produced by convert_model.py onnx
+TFLITE_MODEL_PATH = '221IT019_CNN_model_int8.tflite'  # produced by convert_model.py tflite
+# Which model to serve: "keras" (the .h5 model), "onnx" or "tflite"
+MODEL_BACKEND = os.environ.get("MODEL_BACKEND", "keras")
 scaler = joblib.load('221IT019_scaler.pkl')
+assert isinstance(scaler, StandardScaler), f"Expected a StandardScaler, got {type(scaler).__name__}"
 
-# Global variable to store prediction results
-results_data = []  # Each entry: (URL, Prediction, Probability)
+# Apply the fitted scaler as a single NumPy expression instead of going through
+# scaler.transform, which re-validates its input on every call.
+SCALER_MEAN = (scaler.mean_ if scaler.with_mean else np.zeros(scaler.n_features_in_)).astype(np.float32)
+SCALER_INV_SCALE = (1.0 / scaler.scale_ if scaler.with_std else np.ones(scaler.n_features_in_)).astype(np.float32)
+
+def scale_features(features):
+    """Equivalent of scaler.transform for a (N, num_features) array; float32 input is scaled in place."""
+    if features.shape[-1] != SCALER_MEAN.shape[0]:
+        raise ValueError(f"Expected {SCALER_MEAN.shape[0]} features, got {features.shape[-1]}")
+    features = features.astype(np.float32, copy=False)
+    features -= SCALER_MEAN
+    features *= SCALER_INV_SCALE
+    return features
+
+if MODEL_BACKEND == 'onnx':
+    import onnxruntime as ort
+
+    # ONNX Runtime serves the exported CNN without loading TensorFlow at all
+    sess_options = ort.SessionOptions()
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    sess_options.intra_op_num_threads = 1
+    session = ort.InferenceSession(ONNX_MODEL_PATH, sess_options=sess_options, providers=['CPUExecutionProvider'])
+    input_name = session.get_inputs()[0].name
+
+    def infer(x):
+        return session.run(None, {input_name: x})[0]
+elif MODEL_BACKEND == 'tflite':
+    import tensorflow as tf
+
+    # TFLite interpreter for the int8-quantized model
+    interpreter = tf.lite.Interpreter(model_path=TFLITE_MODEL_PATH, num_threads=2)
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+    _allocated_shape = None
+
+    def infer(x):
+        global _allocated_shape
+        # Only re-allocate when the batch size changes; only the batcher thread calls this
+        if x.shape != _allocated_shape:
+            interpreter.resize_tensor_input(input_index, x.shape)
+            interpreter.allocate_tensors()
+            _allocated_shape = x.shape
+        interpreter.set_tensor(input_index, x)
+        interpreter.invoke()
+        return interpreter.get_tensor(output_index)
+elif MODEL_BACKEND == 'keras':
+    import tensorflow as tf
+    from tensorflow.keras.models import load_model
+
+    # Requests are served concurrently by the WSGI server, so keep TF from fanning each one out further
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    model = load_model(MODEL_PATH)
+    # Trace the forward pass once for a fixed input signature; calling the concrete
+    # function directly skips model.predict's per-call setup and callback machinery.
+    concrete_fn = tf.function(
+        lambda x: model(x, training=False),
+        input_signature=[tf.TensorSpec([None, len(FEATURE_ORDER), 1], tf.float32)],
+    ).get_concrete_function()
+
+    def infer(x):
+        return concrete_fn(tf.constant(x)).numpy()
+else:
+    raise ValueError(f"Unknown MODEL_BACKEND {MODEL_BACKEND!r}; expected 'keras', 'onnx' or 'tflite'")
+
+PREDICT_BATCH_SIZE = 256
+
+def predict_proba(features_cnn):
+    """Returns the phishing probability for each row of a (N, num_features, 1) array."""
+    features_cnn = np.ascontiguousarray(features_cnn, dtype=np.float32)
+    probs = [
+        infer(features_cnn[start:start + PREDICT_BATCH_SIZE])
+        for start in range(0, len(features_cnn), PREDICT_BATCH_SIZE)
+    ]
+    return np.concatenate(probs).ravel()
+
+# All model calls go through one batcher so concurrent requests share a forward pass
+batcher = MicroBatcher(predict_proba, max_batch_size=64, max_wait=0.005)
+
+# Prediction results wait in a bounded buffer until the background flusher
+# appends them to OUTPUT_CSV, so memory stays flat however long the app runs.
+RESULTS_BUFFER_SIZE = 10000
+FLUSH_INTERVAL = 1.0  # seconds
+results_data = deque(maxlen=RESULTS_BUFFER_SIZE)  # Each entry: (URL, Prediction, Probability)
+results_lock = threading.Lock()
 OUTPUT_CSV = "results.csv"
+CSV_HEADER = ['URL', 'Prediction', 'Probability']
+_csv_initialized = False
+
+def _write_rows(rows):
+    """Appends rows to OUTPUT_CSV; the first write of the process starts the file afresh with a header.
+    Callers must hold results_lock."""
+    global _csv_initialized
+    with open(OUTPUT_CSV, 'a' if _csv_initialized else 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        if not _csv_initialized:
+            writer.writerow(CSV_HEADER)
+        # Match DataFrame.to_csv: missing URLs as empty fields, probabilities as float64
+        writer.writerows(('' if pd.isna(url) else url, prediction, float(prob)) for url, prediction, prob in rows)
+    _csv_initialized = True
+
+def record_results(rows):
+    """Buffers new result rows for the flusher."""
+    with results_lock:
+        if len(results_data) + len(rows) > RESULTS_BUFFER_SIZE:
+            # Buffering these would push older rows out of the deque; write everything now instead
+            _write_rows(list(results_data) + list(rows))
+            results_data.clear()
+        else:
+            results_data.extend(rows)
+
+def flush_results():
+    """Moves all buffered rows to the end of OUTPUT_CSV."""
+    with results_lock:
+        if results_data:
+            _write_rows(list(results_data))
+            results_data.clear()
 
-def update_output_csv():
-    """Writes the current results_data to the OUTPUT_CSV file."""
-    df = pd.DataFrame(results_data, columns=['URL', 'Prediction', 'Probability'])
-    df.to_csv(OUTPUT_CSV, index=False)
+def _flush_periodically():
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        flush_results()
+
+threading.Thread(target=_flush_periodically, name="results-flusher", daemon=True).start()
+atexit.register(flush_results)
 
 @app.route('/')
 def home():
@@ -34,28 +163,74 @@ def predict():
     if not (url.startswith("http://") or url.startswith("https://")):
         return jsonify({'error': 'Please enter a valid URL starting with http:// or https://'}), 400
 
-    features = extract_url_features(url)
-    print("Extracted features:", features)
-    feature_names = list(features.keys())
-    features_df = pd.DataFrame([features], columns=feature_names)
+    features = cached_url_features(url)
+    print("Extracted features:", features.tolist())
+    features_vec = features.reshape(1, -1)
 
     try:
-        features_scaled = scaler.transform(features_df)
+        features_scaled = scale_features(features_vec)
         print("Scaled features:", features_scaled.flatten().tolist())
     except ValueError as e:
         print(f"Error scaling features: {e}")
         return jsonify({'error': 'Feature scaling mismatch with model expectations'}), 500
 
-    num_features = features_df.shape[1]
+    num_features = features_vec.shape[1]
     features_cnn = features_scaled.reshape((1, num_features, 1))
-    prediction_prob = model.predict(features_cnn, verbose=0)[0][0]
+    prediction_prob = float(batcher.predict(features_cnn)[0])
     print("Prediction probability:", prediction_prob)
     result = 'phishing' if prediction_prob > 0.5 else 'benign'
 
-    results_data.append((url, result, prediction_prob))
-    update_output_csv()
+    record_results([(url, result, prediction_prob)])
+
+    return jsonify({'prediction': result, 'probability': prediction_prob})
+
+PREDICT_CHUNK_SIZE = 1024  # CSV rows read and classified at a time
+
+# Batch feature extraction is CPU-bound, so under gunicorn it is spread over
+# worker processes (EXTRACT_WORKERS=1 keeps it in-process). By default the cores
+# are shared between the gunicorn workers (WEB_CONCURRENCY, which gunicorn reads
+# too). The pool is only started by the first batch.
+if __name__ == '__main__':
+    # Extraction workers would each re-import this script as __mp_main__ (loading
+    # the model and starting its threads again), so `python app.py` stays in-process
+    EXTRACT_WORKERS = 1
+else:
+    WEB_WORKERS = int(os.environ.get("WEB_CONCURRENCY", 1))
+    EXTRACT_WORKERS = int(os.environ.get("EXTRACT_WORKERS", max(1, (os.cpu_count() or 1) // WEB_WORKERS)))
+
+def predict_urls(urls):
+    """Classifies a list of URLs; returns (URL, Prediction, Probability) rows in input order."""
+    batch_results = [None] * len(urls)
+
+    # Extract features for every valid URL (DNS lookups run concurrently), then
+    # run the model once
+    valid_idx = []
+    for i, url in enumerate(urls):
+        if not (isinstance(url, str) and (url.startswith("http://") or url.startswith("https://"))):
+            batch_results[i] = (url, 'invalid URL', 0)
+            continue
+        valid_idx.append(i)
 
-    return jsonify({'prediction': result, 'probability': float(prediction_prob)})
+    if valid_idx:
+        features_arr = np.empty((len(valid_idx), len(FEATURE_ORDER)), dtype=np.float32)
+        asyncio.run(process_urls_sync_only((urls[i] for i in valid_idx), out=features_arr,
+                                           executor=extraction_pool(EXTRACT_WORKERS), num_workers=EXTRACT_WORKERS))
+        try:
+            features_scaled = scale_features(features_arr)
+        except ValueError:
+            # A feature-count mismatch affects every row alike
+            for i in valid_idx:
+                batch_results[i] = (urls[i], 'scaling error', 0)
+            return batch_results
+
+        num_features = features_arr.shape[1]
+        features_cnn = features_scaled.reshape((-1, num_features, 1))
+        probs = batcher.predict(features_cnn)
+        results = np.where(probs > 0.5, 'phishing', 'benign')
+        for i, result, prediction_prob in zip(valid_idx, results, probs):
+            batch_results[i] = (urls[i], str(result), prediction_prob)
+
+    return batch_results
 
 @app.route('/predict_batch', methods=['POST'])
 def predict_batch():
@@ -65,45 +240,41 @@ def predict_batch():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
 
+    # Read the CSV a chunk at a time so memory stays flat however large the upload is
     try:
-        df = pd.read_csv(file)
-        if 'URL' not in df.columns:
-            return jsonify({'error': "CSV file must contain 'URL' column"}), 400
-
-        batch_results = []
-        for url in df['URL']:
-            if not (isinstance(url, str) and (url.startswith("http://") or url.startswith("https://"))):
-                batch_results.append((url, 'invalid URL', 0))
-                continue
-            features = extract_url_features(url)
-            feature_names = list(features.keys())
-            features_df = pd.DataFrame([features], columns=feature_names)
-            try:
-                features_scaled = scaler.transform(features_df)
-            except ValueError:
-                batch_results.append((url, 'scaling error', 0))
-                continue
-
-            num_features = features_df.shape[1]
-            features_cnn = features_scaled.reshape((1, num_features, 1))
-            prediction_prob = model.predict(features_cnn, verbose=0)[0][0]
-            result = 'phishing' if prediction_prob > 0.5 else 'benign'
-            batch_results.append((url, result, prediction_prob))
-
-        results_data.extend(batch_results)
-        update_output_csv()
-
-        return jsonify({'processed': len(batch_results)})
+        reader = pd.read_csv(file, usecols=['URL'], chunksize=PREDICT_CHUNK_SIZE)
     except Exception as e:
+        # Decode and parse errors are ValueErrors too; only a missing column is the client's 400
+        if isinstance(e, ValueError) and str(e).startswith("Usecols do not match columns"):
+            return jsonify({'error': "CSV file must contain 'URL' column"}), 400
         print("Error during batch processing:", e)
         return jsonify({'error': 'Error processing CSV file'}), 500
 
+    def generate():
+        # One JSON object per line: progress after each chunk, then a final summary
+        processed = 0
+        try:
+            for chunk in reader:
+                batch_results = predict_urls(chunk['URL'].tolist())
+                record_results(batch_results)
+                processed += len(batch_results)
+                yield json.dumps({'processed': processed}) + '\n'
+        except Exception as e:
+            print("Error during batch processing:", e)
+            yield json.dumps({'error': 'Error processing CSV file'}) + '\n'
+            return
+        yield json.dumps({'processed': processed, 'done': True}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @app.route('/download_output', methods=['GET'])
 def download_output():
+    # Include rows the flusher hasn't written yet
+    flush_results()
     if os.path.exists(OUTPUT_CSV):
         return send_file(OUTPUT_CSV, as_attachment=True)
     else:
-        df = pd.DataFrame(columns=['URL', 'Prediction', 'Probability'])
+        df = pd.DataFrame(columns=CSV_HEADER)
         df.to_csv(OUTPUT_CSV, index=False)
         return send_file(OUTPUT_CSV, as_attachment=True)
 
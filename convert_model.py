@@ -0,0 +1,68 @@
+"""Exports the trained Keras CNN to the lighter formats app.py can serve.
+
+Usage: python convert_model.py onnx
+       python convert_model.py tflite urls.csv [num_samples]
+
+Writes only the requested format. "onnx" needs tf2onnx, which is only
+required here. "tflite" writes an int8-quantized model; the URLs in the CSV
+('URL' column) are run through the same feature extraction and scaling as the
+app to calibrate the quantization ranges.
+
+app.py keeps serving the Keras model until MODEL_BACKEND is set to the
+matching backend ("onnx" or "tflite").
+"""
+import asyncio
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from extract_features import process_urls_sync_only, FEATURE_ORDER
+
+MODEL_PATH = '221IT019_CNN_model.h5'
+SCALER_PATH = '221IT019_scaler.pkl'
+ONNX_MODEL_PATH = '221IT019_CNN_model.onnx'
+TFLITE_MODEL_PATH = '221IT019_CNN_model_int8.tflite'
+
+
+def representative_samples(csv_path, num_samples):
+    urls = pd.read_csv(csv_path, usecols=['URL'])['URL']
+    urls = urls[urls.astype(str).str.match(r'https?://')].head(num_samples)
+    scaler = joblib.load(SCALER_PATH)
+    # Same extraction as /predict_batch, including the DNS lookups for f55
+    features = scaler.transform(asyncio.run(process_urls_sync_only(urls)))
+    return features.astype(np.float32).reshape((len(features), features.shape[1], 1))
+
+
+def convert_to_tflite(model, samples):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: ([sample[np.newaxis]] for sample in samples)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return converter.convert()
+
+
+def convert_to_onnx(model):
+    import tf2onnx
+
+    input_signature = [tf.TensorSpec([None, len(FEATURE_ORDER), 1], tf.float32, name='input')]
+    tf2onnx.convert.from_keras(model, input_signature=input_signature, opset=17, output_path=ONNX_MODEL_PATH)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if not (args == ['onnx'] or (args[:1] == ['tflite'] and 2 <= len(args) <= 3)):
+        sys.exit(__doc__)
+    model = load_model(MODEL_PATH)
+    if args[0] == 'onnx':
+        convert_to_onnx(model)
+        print(f"Wrote {ONNX_MODEL_PATH}")
+    else:
+        num_samples = int(args[2]) if len(args) > 2 else 500
+        samples = representative_samples(args[1], num_samples)
+        with open(TFLITE_MODEL_PATH, 'wb') as f:
+            f.write(convert_to_tflite(model, samples))
+        print(f"Wrote {TFLITE_MODEL_PATH} (calibrated on {len(samples)} URLs)")
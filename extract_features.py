@@ -3,23 +3,165 @@ from urllib.parse import urlparse
 import tldextract
 import socket
 from functools import lru_cache
-from collections import OrderedDict
+from enum import IntEnum
 import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import aiodns
 import aiohttp
+import numpy as np
 
 # Precompile regex patterns for efficiency
 IP_PATTERN = re.compile(r'^\d{1,3}(?:\.\d{1,3}){3}$')
 WORD_PATTERN = re.compile(r'[A-Za-z0-9]+')
 SUBDOMAIN_PATTERN = re.compile(r'^w+\d*$')
 
-# Cache DNS lookups to avoid redundant network calls
-@lru_cache(maxsize=10000)
+# Cache DNS lookups to avoid redundant network calls. The cache is shared by the
+# blocking lookup below and the concurrent resolver used for batches.
+DNS_CACHE_SIZE = 10000
+DNS_CONCURRENCY = 100
+_dns_cache = {}
+_dns_cache_lock = threading.Lock()
+
+def _remember_dns(hostname, record):
+    with _dns_cache_lock:
+        if hostname not in _dns_cache and len(_dns_cache) >= DNS_CACHE_SIZE:
+            _dns_cache.pop(next(iter(_dns_cache)))
+        _dns_cache[hostname] = record
+
 def cached_gethostbyname(hostname):
-    try:
-        socket.gethostbyname(hostname)
-        return 1
-    except Exception:
-        return 0
+    record = _dns_cache.get(hostname)
+    if record is None:
+        try:
+            socket.gethostbyname(hostname)
+            record = 1
+        except Exception:
+            record = 0
+        _remember_dns(hostname, record)
+    return record
+
+def byte_counts(s):
+    """Histogram of the UTF-8 bytes of ``s``; entries for ASCII characters equal ``s.count(ch)``."""
+    return np.bincount(np.frombuffer(s.encode('utf-8', 'ignore'), dtype=np.uint8), minlength=256)
+
+# Single-character features (f4-f19) read straight from the URL's byte histogram
+SPECIAL_CHARS = {
+    'f4_dot': ord('.'), 'f5_hyphen': ord('-'), 'f6_at': ord('@'), 'f7_question': ord('?'),
+    'f8_ampersand': ord('&'), 'f9_pipe': ord('|'), 'f10_equal': ord('='), 'f11_underscore': ord('_'),
+    'f12_tilde': ord('~'), 'f13_percent': ord('%'), 'f14_slash': ord('/'), 'f15_asterisk': ord('*'),
+    'f16_colon': ord(':'), 'f17_comma': ord(','), 'f18_semicolon': ord(';'), 'f19_dollar': ord('$'),
+}
+
+def fast_parse(url):
+    """Splits a plain http(s) URL into (scheme, netloc, path, query, fragment, port).
+
+    Gives the same components as urlparse using a handful of str.find calls.
+    Returns None for anything it can't handle identically (other schemes,
+    non-ASCII, IPv6 literals, tabs/newlines, ';' path params, odd ports) so the
+    caller can fall back to urlparse.
+    """
+    if url.startswith('https://'):
+        scheme, start = 'https', 8
+    elif url.startswith('http://'):
+        scheme, start = 'http', 7
+    else:
+        return None
+    if not url.isascii() or '\t' in url or '\r' in url or '\n' in url or ';' in url:
+        return None
+    end = len(url)
+    for delim in '/?#':
+        i = url.find(delim, start, end)
+        if i >= 0:
+            end = i
+    netloc = url[start:end]
+    if '[' in netloc or ']' in netloc:
+        return None
+    path = url[end:]
+    fragment = query = ''
+    i = path.find('#')
+    if i >= 0:
+        path, fragment = path[:i], path[i + 1:]
+    i = path.find('?')
+    if i >= 0:
+        path, query = path[:i], path[i + 1:]
+    port = netloc.rpartition('@')[2].partition(':')[2]
+    if port:
+        if not port.isdigit() or int(port) > 65535:
+            return None
+        port = int(port)
+    else:
+        port = None
+    return scheme, netloc, path, query, fragment, port
+
+# One extractor for the whole process, built from the suffix-list snapshot bundled
+# with tldextract: no network fetch and no on-disk cache checks per call.
+TLD = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None, include_psl_private_domains=False)
+TLD('http://example.com')  # load the suffix list now rather than on the first request
+
+@lru_cache(maxsize=10000)
+def split_host(netloc):
+    """(subdomain, domain, suffix) of a netloc; the suffix-list lookup is done once per host."""
+    ext = TLD(netloc)
+    return ext.subdomain, ext.domain, ext.suffix
+
+def parse_url(url):
+    """Returns (scheme, netloc, path, query, fragment, port, subdomain, domain, suffix) for ``url``."""
+    parts = fast_parse(url)
+    if parts is not None:
+        return parts + split_host(parts[1])
+    parsed = urlparse(url)
+    ext = TLD(url)
+    return (parsed.scheme, parsed.netloc, parsed.path, parsed.query, parsed.fragment, parsed.port,
+            ext.subdomain, ext.domain, ext.suffix)
+
+# Keyword sets shared by the per-URL and batch extractors
+SHORTENING_SERVICES = {'bit.ly', 'tinyurl.com', 'goo.gl', 'ow.ly', 't.co', 'is.gd', 'buff.ly', 'adf.ly'}
+SUSPICIOUS_EXTS = {'.exe', '.js', '.txt'}
+SENSITIVE_WORDS = {"login", "signin", "verify", "account", "update", "secure", "confirm", "bank", "paypal", "ebay", "admin", "security", "password"}
+BRANDS = {"google", "facebook", "amazon", "paypal", "apple", "microsoft", "ebay"}
+SUSPICIOUS_TLDS = {"tk", "ml", "ga", "cf", "gq"}
+
+# One precompiled alternation per keyword group replaces a substring test per word.
+# The phish-hint pattern is a lookahead so matches may overlap (e.g. "securebay"
+# counts both "secure" and "ebay"); since no hint word overlaps itself or is a
+# prefix of another, the match count equals sum(url.count(word)).
+PHISH_HINTS_PATTERN = re.compile('(?=(' + '|'.join(map(re.escape, sorted(SENSITIVE_WORDS))) + '))')
+BRAND_PATTERN = re.compile('|'.join(map(re.escape, sorted(BRANDS))))
+SERVER_CLIENT_PATTERN = re.compile('server|client')
+
+def max_char_repeat(s):
+    """Length of the longest run of a single repeated character in ``s``."""
+    max_repeat = 0
+    current_char = ''
+    current_count = 0
+    for char in s:
+        if char == current_char:
+            current_count += 1
+        else:
+            current_char = char
+            current_count = 1
+        max_repeat = max(max_repeat, current_count)
+    return max_repeat
+
+def _max_run(buf):
+    """Longest run of one repeated byte in ``buf``, from the gaps between value changes."""
+    edges = np.flatnonzero(buf[1:] != buf[:-1])
+    if edges.size == 0:
+        return buf.size
+    # Runs between changes, plus the first and last runs, which end at the buffer edges
+    inner = int(np.diff(edges).max()) if edges.size > 1 else 0
+    return max(inner, int(edges[0]) + 1, buf.size - 1 - int(edges[-1]))
+
+# 256-entry character-class tables indexed by byte value. Dotted with a
+# byte_counts histogram they count class members without a per-character call.
+DIGIT_LUT = np.zeros(256, dtype=np.uint8)
+DIGIT_LUT[ord('0'):ord('9') + 1] = 1
+ALNUM_LUT = DIGIT_LUT.copy()
+ALNUM_LUT[ord('A'):ord('Z') + 1] = 1
+ALNUM_LUT[ord('a'):ord('z') + 1] = 1
+VOWEL_LUT = np.zeros(256, dtype=np.uint8)
+VOWEL_LUT[list(b'aeiou')] = 1
 
 # Define the feature order used during training
 FEATURE_ORDER = [
@@ -47,132 +189,151 @@ FEATURE_ORDER = [
     'f82_is_encoded', 'f83_server_client_domain', 'f84_tld_length'
 ]
 
-def extract_url_features(url):
-    features = {}
-    parsed = urlparse(url)
-    hostname = parsed.netloc
-    path = parsed.path
-    query = parsed.query
-    fragment = parsed.fragment
-    ext = tldextract.extract(url)
-    subdomain = ext.subdomain
-    tld = ext.suffix
-    domain_main = ext.domain
-    domain_full = parsed.netloc
+# Column index of every feature in the extracted vectors, e.g. out[F.f1_url_length]
+F = IntEnum('F', [(name, i) for i, name in enumerate(FEATURE_ORDER)])
+SPECIAL_CHAR_BYTES = np.array(list(SPECIAL_CHARS.values()))
+
+def extract_url_features(url, out=None):
+    """Computes the FEATURE_ORDER vector for ``url`` into ``out`` (a float32 array of length
+    len(FEATURE_ORDER), allocated if not given) and returns it."""
+    if out is None:
+        out = np.empty(len(FEATURE_ORDER), dtype=np.float32)
+    scheme, hostname, path, query, fragment, port, subdomain, domain_main, tld = parse_url(url)
+    domain_full = hostname
     url_lower = url.lower()
+    # Count every character of each component in one pass instead of one str.count per feature
+    url_bytes = np.frombuffer(url.encode('utf-8', 'ignore'), dtype=np.uint8)
+    url_bc = np.bincount(url_bytes, minlength=256)
+    path_bc = byte_counts(path)
+    dom_bc = byte_counts(domain_full)
+    query_bc = byte_counts(query)
+    if url.isascii():
+        # Every component of an ASCII URL is ASCII too, so the byte histograms count characters
+        digits_url = int(DIGIT_LUT @ url_bc)
+        digits_hostname = int(DIGIT_LUT @ dom_bc)  # domain_full is the same netloc string as hostname
+        non_alnum_path = len(path) - int(ALNUM_LUT @ path_bc)
+        vowels = int(VOWEL_LUT @ byte_counts(domain_main.lower()))
+        max_repeat = _max_run(url_bytes)
+    else:
+        digits_url = sum(c.isdigit() for c in url)
+        digits_hostname = sum(c.isdigit() for c in hostname)
+        non_alnum_path = sum(not c.isalnum() for c in path)
+        vowels = sum(1 for c in domain_main.lower() if c in 'aeiou')
+        max_repeat = max_char_repeat(url)
 
-    # Original 56 Features (f1 to f56)
-    features['f1_url_length'] = len(url)
-    features['f2_hostname_length'] = len(hostname)
-    features['f3_has_ip'] = 1 if IP_PATTERN.match(hostname) else 0
-    special_chars = {
-        'f4_dot': '.', 'f5_hyphen': '-', 'f6_at': '@', 'f7_question': '?',
-        'f8_ampersand': '&', 'f9_pipe': '|', 'f10_equal': '=', 'f11_underscore': '_',
-        'f12_tilde': '~', 'f13_percent': '%', 'f14_slash': '/', 'f15_asterisk': '*',
-        'f16_colon': ':', 'f17_comma': ',', 'f18_semicolon': ';', 'f19_dollar': '$',
-        'f20_space_or_%20': ['%20', ' ']
-    }
-    for key, char in special_chars.items():
-        if key == 'f20_space_or_%20':
-            features[key] = sum(url.count(c) for c in char)
-        else:
-            features[key] = url.count(char)
-    features['f21_www_count'] = url_lower.count("www")
-    features['f22_dotcom_count'] = url_lower.count(".com")
-    features['f23_http_count'] = url_lower.count("http")
-    features['f24_double_slash_count'] = url.count("//")
-    features['f25_https'] = 1 if parsed.scheme.lower() == 'https' else 0
-    digits_url = sum(c.isdigit() for c in url)
-    features['f26_digit_ratio_url'] = digits_url / len(url) if len(url) > 0 else 0
-    digits_hostname = sum(c.isdigit() for c in hostname)
-    features['f27_digit_ratio_hostname'] = digits_hostname / len(hostname) if len(hostname) > 0 else 0
-    features['f28_punycode'] = 1 if "xn--" in hostname else 0
-    features['f29_port'] = 1 if parsed.port else 0
-    features['f30_tld_in_path'] = 1 if tld and tld in path else 0
-    features['f31_tld_in_subdomain'] = 1 if tld and tld in subdomain else 0
-    features['f32_abnormal_subdomain'] = 1 if subdomain and subdomain.lower() != "www" and SUBDOMAIN_PATTERN.match(subdomain) else 0
-    features['f33_subdomain_count'] = len(subdomain.split('.')) if subdomain else 0
-    features['f34_prefix_suffix'] = 1 if '-' in domain_main else 0
-    vowels = sum(1 for c in domain_main.lower() if c in 'aeiou')
-    features['f35_random_domain'] = 1 if domain_main and (vowels / len(domain_main)) < 0.3 else 0
-    shortening_services = {'bit.ly', 'tinyurl.com', 'goo.gl', 'ow.ly', 't.co', 'is.gd', 'buff.ly', 'adf.ly'}
-    features['f36_shortening_service'] = 1 if hostname.lower() in shortening_services else 0
-    suspicious_exts = {'.exe', '.js', '.txt'}
-    features['f37_suspicious_extension'] = 1 if any(path.lower().endswith(ext) for ext in suspicious_exts) else 0
-
-    # For f38 and f39, which were provided asynchronously during training, set default values
-    features['f38_redirection_count'] = -1
-    features['f39_external_redirections'] = -1
-
-    # Continue with remaining features
     words_url = WORD_PATTERN.findall(url)
-    features['f40_word_count_url'] = len(words_url)
-    max_repeat = 0
-    current_char = ''
-    current_count = 0
-    for char in url:
-        if char == current_char:
-            current_count += 1
-        else:
-            current_char = char
-            current_count = 1
-        max_repeat = max(max_repeat, current_count)
-    features['f41_max_char_repeat'] = max_repeat
-    features['f42_shortest_word_length_url'] = min((len(w) for w in words_url), default=0)
     words_hostname = WORD_PATTERN.findall(hostname)
-    features['f43_word_count_hostname'] = len(words_hostname)
     words_path = WORD_PATTERN.findall(path)
-    features['f44_word_count_path'] = len(words_path)
-    features['f45_longest_word_length_url'] = max((len(w) for w in words_url), default=0)
-    features['f46_longest_word_length_hostname'] = max((len(w) for w in words_hostname), default=0)
-    features['f47_longest_word_length_path'] = max((len(w) for w in words_path), default=0)
-    features['f48_avg_word_length_url'] = sum(len(w) for w in words_url) / len(words_url) if words_url else 0
-    features['f49_avg_word_length_hostname'] = sum(len(w) for w in words_hostname) / len(words_hostname) if words_hostname else 0
-    features['f50_avg_word_length_path'] = sum(len(w) for w in words_path) / len(words_path) if words_path else 0
-    sensitive_words = {"login", "signin", "verify", "account", "update", "secure", "confirm", "bank", "paypal", "ebay", "admin", "security", "password"}
-    features['f51_phish_hints'] = sum(url_lower.count(word) for word in sensitive_words)
-    brands = {"google", "facebook", "amazon", "paypal", "apple", "microsoft", "ebay"}
     domain_lower = domain_main.lower()
-    features['f52_brand_in_domain'] = 1 if any(brand in domain_lower for brand in brands) else 0
-    features['f53_brand_in_subdomain'] = 1 if any(brand in subdomain.lower() for brand in brands) else 0
-    features['f54_brand_in_path'] = 1 if any(brand in path.lower() for brand in brands) else 0
-
-    suspicious_tlds = {"tk", "ml", "ga", "cf", "gq"}
-    features['f56_suspicious_tld'] = 1 if tld.lower() in suspicious_tlds else 0
-
-    # Additional 28 Features (f57 to f84)
-    features['f57_qty_dot_domain'] = domain_full.count('.')
-    features['f58_qty_hyphen_domain'] = domain_full.count('-')
-    features['f59_qty_underscore_domain'] = domain_full.count('_')
-    features['f60_qty_at_domain'] = domain_full.count('@')
-    features['f61_qty_percent_domain'] = domain_full.count('%')
-    features['f62_qty_dot_path'] = path.count('.')
-    features['f63_qty_hyphen_path'] = path.count('-')
-    features['f64_qty_slash_path'] = path.count('/')
-    features['f65_qty_question_path'] = path.count('?')
-    features['f66_qty_equal_path'] = path.count('=')
-    features['f67_qty_dot_query'] = query.count('.')
-    features['f68_qty_hyphen_query'] = query.count('-')
-    features['f69_qty_equal_query'] = query.count('=')
-    features['f70_qty_ampersand_query'] = query.count('&')
-    features['f71_qty_percent_query'] = query.count('%')
-    features['f72_length_domain'] = len(domain_full)
-    features['f73_length_path'] = len(path)
-    features['f74_length_query'] = len(query)
-    features['f75_number_of_directories'] = len(path.split('/')) - 1 if path and path != '/' else 0
-    features['f76_number_of_query_params'] = len(query.split('&')) if query else 0
-    features['f77_presence_of_fragment'] = 1 if fragment else 0
-    features['f78_number_of_encoded_chars'] = url.count('%')
-    features['f79_presence_of_email'] = 1 if 'mailto:' in url_lower else 0
-    features['f80_digit_ratio_domain'] = sum(c.isdigit() for c in domain_full) / len(domain_full) if domain_full else 0
-    features['f81_special_char_ratio_path'] = sum(not c.isalnum() for c in path) / len(path) if path else 0
-    features['f82_is_encoded'] = 1 if '%' in url else 0
-    features['f83_server_client_domain'] = 1 if any(word in domain_lower for word in {'server', 'client'}) else 0
-    features['f84_tld_length'] = len(tld)
-
-    # Return the features in the exact training order as an OrderedDict.
-    ordered_features = OrderedDict((key, features.get(key, -1)) for key in FEATURE_ORDER)
-    return ordered_features
+
+    # Values are listed in FEATURE_ORDER and stored with a single assignment
+    out[:] = [
+        # Original 56 Features (f1 to f56)
+        len(url),  # f1_url_length
+        len(hostname),  # f2_hostname_length
+        1 if IP_PATTERN.match(hostname) else 0,  # f3_has_ip
+        *url_bc[SPECIAL_CHAR_BYTES].tolist(),  # f4_dot .. f19_dollar
+        url.count('%20') + int(url_bc[ord(' ')]),  # f20_space_or_%20
+        url_lower.count("www"),  # f21_www_count
+        url_lower.count(".com"),  # f22_dotcom_count
+        url_lower.count("http"),  # f23_http_count
+        url.count("//"),  # f24_double_slash_count
+        1 if scheme.lower() == 'https' else 0,  # f25_https
+        digits_url / len(url) if len(url) > 0 else 0,  # f26_digit_ratio_url
+        digits_hostname / len(hostname) if len(hostname) > 0 else 0,  # f27_digit_ratio_hostname
+        1 if "xn--" in hostname else 0,  # f28_punycode
+        1 if port else 0,  # f29_port
+        1 if tld and tld in path else 0,  # f30_tld_in_path
+        1 if tld and tld in subdomain else 0,  # f31_tld_in_subdomain
+        1 if subdomain and subdomain.lower() != "www" and SUBDOMAIN_PATTERN.match(subdomain) else 0,  # f32_abnormal_subdomain
+        len(subdomain.split('.')) if subdomain else 0,  # f33_subdomain_count
+        1 if '-' in domain_main else 0,  # f34_prefix_suffix
+        1 if domain_main and (vowels / len(domain_main)) < 0.3 else 0,  # f35_random_domain
+        1 if hostname.lower() in SHORTENING_SERVICES else 0,  # f36_shortening_service
+        1 if any(path.lower().endswith(ext) for ext in SUSPICIOUS_EXTS) else 0,  # f37_suspicious_extension
+        # For f38 and f39, which were provided asynchronously during training, set default values
+        -1,  # f38_redirection_count
+        -1,  # f39_external_redirections
+        len(words_url),  # f40_word_count_url
+        max_repeat,  # f41_max_char_repeat
+        min((len(w) for w in words_url), default=0),  # f42_shortest_word_length_url
+        len(words_hostname),  # f43_word_count_hostname
+        len(words_path),  # f44_word_count_path
+        max((len(w) for w in words_url), default=0),  # f45_longest_word_length_url
+        max((len(w) for w in words_hostname), default=0),  # f46_longest_word_length_hostname
+        max((len(w) for w in words_path), default=0),  # f47_longest_word_length_path
+        sum(len(w) for w in words_url) / len(words_url) if words_url else 0,  # f48_avg_word_length_url
+        sum(len(w) for w in words_hostname) / len(words_hostname) if words_hostname else 0,  # f49_avg_word_length_hostname
+        sum(len(w) for w in words_path) / len(words_path) if words_path else 0,  # f50_avg_word_length_path
+        len(PHISH_HINTS_PATTERN.findall(url_lower)),  # f51_phish_hints
+        1 if BRAND_PATTERN.search(domain_lower) else 0,  # f52_brand_in_domain
+        1 if BRAND_PATTERN.search(subdomain.lower()) else 0,  # f53_brand_in_subdomain
+        1 if BRAND_PATTERN.search(path.lower()) else 0,  # f54_brand_in_path
+        # f55 needs a DNS lookup; callers that resolve it overwrite this default
+        -1,  # f55_dns_record
+        1 if tld.lower() in SUSPICIOUS_TLDS else 0,  # f56_suspicious_tld
+        # Additional 28 Features (f57 to f84)
+        int(dom_bc[ord('.')]),  # f57_qty_dot_domain
+        int(dom_bc[ord('-')]),  # f58_qty_hyphen_domain
+        int(dom_bc[ord('_')]),  # f59_qty_underscore_domain
+        int(dom_bc[ord('@')]),  # f60_qty_at_domain
+        int(dom_bc[ord('%')]),  # f61_qty_percent_domain
+        int(path_bc[ord('.')]),  # f62_qty_dot_path
+        int(path_bc[ord('-')]),  # f63_qty_hyphen_path
+        int(path_bc[ord('/')]),  # f64_qty_slash_path
+        int(path_bc[ord('?')]),  # f65_qty_question_path
+        int(path_bc[ord('=')]),  # f66_qty_equal_path
+        int(query_bc[ord('.')]),  # f67_qty_dot_query
+        int(query_bc[ord('-')]),  # f68_qty_hyphen_query
+        int(query_bc[ord('=')]),  # f69_qty_equal_query
+        int(query_bc[ord('&')]),  # f70_qty_ampersand_query
+        int(query_bc[ord('%')]),  # f71_qty_percent_query
+        len(domain_full),  # f72_length_domain
+        len(path),  # f73_length_path
+        len(query),  # f74_length_query
+        len(path.split('/')) - 1 if path and path != '/' else 0,  # f75_number_of_directories
+        len(query.split('&')) if query else 0,  # f76_number_of_query_params
+        1 if fragment else 0,  # f77_presence_of_fragment
+        int(url_bc[ord('%')]),  # f78_number_of_encoded_chars
+        1 if 'mailto:' in url_lower else 0,  # f79_presence_of_email
+        digits_hostname / len(domain_full) if domain_full else 0,  # f80_digit_ratio_domain
+        non_alnum_path / len(path) if path else 0,  # f81_special_char_ratio_path
+        1 if url_bc[ord('%')] else 0,  # f82_is_encoded
+        1 if SERVER_CLIENT_PATTERN.search(domain_lower) else 0,  # f83_server_client_domain
+        len(tld),  # f84_tld_length
+    ]
+    return out
+
+# Feature extraction is deterministic, so repeated URLs are served from a cache
+# keyed on the raw URL string. Entries are the vector's raw float32 bytes
+# (immutable, and 336 bytes each rather than 84 boxed floats).
+@lru_cache(maxsize=100000)
+def _extract_bytes(url):
+    return extract_url_features(url).tobytes()
+
+def cached_url_features(url):
+    """Memoized extract_url_features; returns a fresh array the caller may modify."""
+    return np.frombuffer(_extract_bytes(url), dtype=np.float32).copy()
+
+def extract_features_batch(urls, out=None):
+    """extract_url_features for a sequence of URLs.
+
+    Fills row i of ``out`` (a float32 array of shape (len(urls), len(FEATURE_ORDER)),
+    allocated if not given) with the features of urls[i]. Each distinct URL is
+    looked up once in the cached_url_features cache (so URLs seen in earlier
+    batches are not extracted again); repeats copy its row.
+    """
+    urls = list(urls)
+    if out is None:
+        out = np.empty((len(urls), len(FEATURE_ORDER)), dtype=np.float32)
+    first_row = {}
+    for i, url in enumerate(urls):
+        j = first_row.setdefault(url, i)
+        if j == i:
+            out[i] = np.frombuffer(_extract_bytes(url), dtype=np.float32)
+        else:
+            out[i] = out[j]
+    return out
 
 # Asynchronous functions for batch processing remain unchanged
 async def fetch_redirects(session, url):
@@ -190,15 +351,86 @@ async def extract_all_features(session, url):
     # Use the synchronous extractor and then update with asynchronous results.
     features = extract_url_features(url)
     redirection_count, external_redirects = await fetch_redirects(session, url)
-    features['f38_redirection_count'] = redirection_count
-    features['f39_external_redirections'] = external_redirects
+    features[F.f38_redirection_count] = redirection_count
+    features[F.f39_external_redirections] = external_redirects
     # Update DNS record info
     parsed = urlparse(url)
     hostname = parsed.netloc
-    features['f55_dns_record'] = cached_gethostbyname(hostname)
-    # Reorder one more time to ensure consistency
-    ordered_features = OrderedDict((key, features.get(key, -1)) for key in FEATURE_ORDER)
-    return ordered_features
+    features[F.f55_dns_record] = cached_gethostbyname(hostname)
+    return features
+
+async def resolve_dns_records(hostnames):
+    """Resolves hostnames concurrently; returns {hostname: 1 or 0} and fills the shared DNS cache."""
+    resolver = aiodns.DNSResolver()
+    semaphore = asyncio.Semaphore(DNS_CONCURRENCY)
+
+    async def resolve(hostname):
+        record = _dns_cache.get(hostname)
+        if record is not None:
+            return record
+        if not hostname:
+            # socket.gethostbyname('') succeeds locally; keep that answer rather than asking the resolver
+            return cached_gethostbyname(hostname)
+        async with semaphore:
+            try:
+                await resolver.gethostbyname(hostname, socket.AF_INET)
+                record = 1
+            except Exception:
+                record = 0
+        _remember_dns(hostname, record)
+        return record
+
+    unique = list(dict.fromkeys(hostnames))
+    records = await asyncio.gather(*(resolve(hostname) for hostname in unique))
+    return dict(zip(unique, records))
+
+MIN_URLS_PER_WORKER = 64  # below this, shipping URLs to another process costs more than it saves
+_extraction_pool = None
+_extraction_pool_lock = threading.Lock()
+
+def extraction_pool(num_workers):
+    """Process pool for process_urls_sync_only, started on first use; None when num_workers <= 1.
+
+    Workers come from a forkserver that preloads this module, so they are never
+    forked from the (multithreaded) web process and start with the suffix list loaded.
+    """
+    global _extraction_pool
+    if num_workers <= 1:
+        return None
+    with _extraction_pool_lock:
+        if _extraction_pool is None:
+            mp_context = multiprocessing.get_context('forkserver')
+            mp_context.set_forkserver_preload([__name__])
+            _extraction_pool = ProcessPoolExecutor(max_workers=num_workers, mp_context=mp_context)
+    return _extraction_pool
+
+
+async def process_urls_sync_only(urls, out=None, executor=None, num_workers=1):
+    """Batch features without the redirect fetches: extract_features_batch plus concurrent DNS lookups (f55).
+
+    With a process ``executor``, the URLs are split into up to ``num_workers``
+    contiguous chunks extracted in parallel while the DNS lookups run.
+    """
+    urls = list(urls)
+    if out is None:
+        out = np.empty((len(urls), len(FEATURE_ORDER)), dtype=np.float32)
+    hostnames = [parse_url(url)[1] for url in urls]
+    num_chunks = min(num_workers, len(urls) // MIN_URLS_PER_WORKER)
+    if executor is None or num_chunks < 2:
+        extract_features_batch(urls, out=out)
+        records = await resolve_dns_records(hostnames)
+    else:
+        loop = asyncio.get_running_loop()
+        bounds = np.linspace(0, len(urls), num_chunks + 1).astype(int)
+        chunks = list(zip(bounds[:-1], bounds[1:]))
+        *parts, records = await asyncio.gather(
+            *(loop.run_in_executor(executor, extract_features_batch, urls[start:end]) for start, end in chunks),
+            resolve_dns_records(hostnames),
+        )
+        for (start, end), part in zip(chunks, parts):
+            out[start:end] = part
+    out[:, F.f55_dns_record] = [records[hostname] for hostname in hostnames]
+    return out
 
 # (Optional) Additional async batch processing functions can remain here.
 async def process_urls(urls):
@@ -0,0 +1,64 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Groups concurrent prediction requests into a single model call.
+
+    Callers submit arrays of one or more rows; a background thread collects
+    whatever arrives within ``max_wait`` seconds (or until ``max_batch_size``
+    rows are queued), runs ``predict_fn`` once on the stacked rows and hands
+    each caller back its own slice of the output.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait=0.005):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        """Queues a (k, ...) array and returns a Future resolving to its k predictions."""
+        future = Future()
+        self._queue.put((features, future))
+        return future
+
+    def predict(self, features):
+        """Blocking helper: submits ``features`` and waits for the result."""
+        return self.submit(features).result()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            rows = len(items[0][0])
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                items.append(item)
+                rows += len(item[0])
+            self._process(items)
+
+    def _process(self, items):
+        try:
+            outputs = self.predict_fn(np.concatenate([features for features, _ in items]))
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+        start = 0
+        for features, future in items:
+            end = start + len(features)
+            future.set_result(outputs[start:end])
+            start = end